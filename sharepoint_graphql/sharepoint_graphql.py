@@ -1,29 +1,42 @@
+import json
+import math
 import os
+import random
+import shutil
 import time
-from io import StringIO
+from collections.abc import Iterator, Sequence
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from io import BytesIO, TextIOWrapper
 from os import PathLike
-from urllib.parse import urlparse
+from urllib.parse import quote, urlparse
 
 import msal
 import requests
+from requests.adapters import HTTPAdapter
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+_json_loads = orjson.loads if orjson is not None else json.loads
 
 
 class ConnectionError(Exception):
     def __init__(self, message):
         super().__init__(message)
-        print(f"ConnectionError: {message}")
 
 
 class SecurityError(Exception):
     def __init__(self, message):
         super().__init__(message)
-        print(f"SecurityError: {message}")
 
 
 class TransactionError(Exception):
     def __init__(self, message):
         super().__init__(message)
-        print(f"TransactionError: {message}")
 
 
 class SharePointGraphql:
@@ -37,6 +50,7 @@ class SharePointGraphql:
     managing file and folder operations.
 
     :ivar access_token: Authentication token for connecting to the Microsoft Graph API.
+        Refreshed through the MSAL token cache shortly before it expires.
     :type access_token: str
     :ivar site_url: The SharePoint site base URL in Graph API format.
     :type site_url: str
@@ -44,32 +58,109 @@ class SharePointGraphql:
     :type site_id: str
     :ivar documents_id: The unique identifier of the "Documents" repository in the SharePoint site.
     :type documents_id: str
+    :ivar session: Pooled HTTP session carrying the authorization header for every Graph call.
+    :type session: requests.Session
     """
     DOWNLOAD_URL_KEY = '@microsoft.graph.downloadUrl'
     GRAPH_BASE_URL = 'https://graph.microsoft.com/v1.0'
-
-    def __init__(self, site_url, tenant_id, client_id, client_secret):
+    POOL_CONNECTIONS = 10
+    POOL_MAXSIZE = 50
+    BATCH_SIZE = 20
+    BATCH_MAX_ATTEMPTS = 3
+    GRAPH_SCOPES = ["https://graph.microsoft.com/.default"]
+    SIMPLE_UPLOAD_LIMIT = 4 * 1024 * 1024
+    UPLOAD_CHUNK_SIZE = 10 * 1024 * 1024  # Graph requires a multiple of 320 KiB
+    DOWNLOAD_CHUNK_SIZE = 1024 * 1024
+    DOWNLOAD_PARTS = 8
+    RANGED_DOWNLOAD_THRESHOLD = 32 * 1024 * 1024
+    TOKEN_REFRESH_MARGIN = 300
+    MAX_RETRIES = 3
+    RETRY_BACKOFF_BASE = 1.0
+    RETRY_BACKOFF_MAX = 30.0
+    RETRY_STATUS_CODES = frozenset({429, 500, 502, 503, 504})
+    REQUEST_TIMEOUT = (10, 60)  # (connect, read) seconds; a streamed read timeout applies per socket read
+    # Merged over the session headers to drop the bearer token for pre-authenticated URLs.
+    _PRE_AUTHENTICATED_HEADERS = {"Authorization": None}
+
+    def __init__(self, site_url, tenant_id, client_id, client_secret, adapter: HTTPAdapter | None = None):
+        self._msal_app = None
+        self._token_expires_at = math.inf
         try:
             self.access_token = self._get_token(client_id, client_secret, tenant_id)
         except KeyError:
             raise SecurityError("Access token not found, please check your credentials")
-        self.headers = {"Authorization": f"Bearer {self.access_token}"}
+        self._pool_maxsize = self.POOL_MAXSIZE if adapter is None else None
+        self._shared_adapter = adapter
+        self.session = self._create_session(adapter)
+        self.session.headers["Authorization"] = f"Bearer {self.access_token}"
 
         self.site_url = self._convert_site_url_to_graph_format(site_url)
-        self.site_id = self._get_site_id(self.headers, self.site_url)
-        self.documents_id = self._get_document_id(self.headers)
+        self.site_id = self._get_site_id(self.site_url)
+        self.documents_id = self._get_document_id()
+        self._root_prefix = f"{self.GRAPH_BASE_URL}/sites/{self.site_id}/drive/root:/"
+        self._drive_children_tmpl = f"{self.GRAPH_BASE_URL}/drives/{self.documents_id}/root:/{{path}}:/children"
+        self._move_parent_tmpl = f"drives/{self.documents_id}/root:/{{path}}"
+
+    @property
+    def headers(self):
+        """
+        The headers sent with every Graph call, including the current authorization header.
+
+        :return: The session's headers.
+        :rtype: requests.structures.CaseInsensitiveDict
+        """
+        return self.session.headers
+
+    def __enter__(self):
+        return self
 
-    def _get_document_id(self, headers):
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        """
+        Releases the pooled connections held by the underlying HTTP session.
+
+        An adapter passed as `adapter=` is left open, since other clients may share it;
+        the caller that created it is responsible for closing it.
+
+        :return: None
+        """
+        for adapter in self.session.adapters.values():
+            if adapter is not self._shared_adapter:
+                adapter.close()
+
+    def _create_session(self, adapter: HTTPAdapter | None = None) -> requests.Session:
+        # A caller-supplied adapter lets several clients share one connection pool
+        # (or plug in a custom transport) while each keeps its own authorization header.
+        session = requests.Session()
+        if adapter is None:
+            adapter = HTTPAdapter(pool_connections=self.POOL_CONNECTIONS, pool_maxsize=self.POOL_MAXSIZE)
+        session.mount("https://", adapter)
+        return session
+
+    def _ensure_pool_capacity(self, connections: int):
+        # A pool smaller than the number of worker threads makes requests open and then
+        # discard extra connections, so grow it before fanning out. Caller-supplied
+        # adapters are left untouched.
+        if self._pool_maxsize is None or connections <= self._pool_maxsize:
+            return
+        self._pool_maxsize = connections
+        previous = self.session.get_adapter("https://")
+        self.session.mount("https://", HTTPAdapter(pool_connections=self.POOL_CONNECTIONS, pool_maxsize=connections))
+        previous.close()
+
+    def _get_document_id(self):
         url = f'{self.GRAPH_BASE_URL}/sites/{self.site_id}/drive/'
-        res = requests.get(url, headers=headers).json()
+        res = self._parse_json(self._retry_request("GET", url))
 
         if 'error' in res:
             raise ConnectionError(res['error']['message'])
         return res['id']
 
-    def _get_site_id(self, headers, site_url):
+    def _get_site_id(self, site_url):
         url = f'{self.GRAPH_BASE_URL}/sites/{site_url}'
-        res = requests.get(url, headers=headers).json()
+        res = self._parse_json(self._retry_request("GET", url))
         return res['id']
 
     @staticmethod
@@ -85,68 +176,154 @@ class SharePointGraphql:
         Constructs a Microsoft Graph API URL for a given remote path and action.
 
         :param remote_path: The relative path of the file or folder in SharePoint.
-        :param action: The action to perform (e.g., 'content' for upload/download).
+        :param action: The action to perform (e.g., 'content' for upload/download,
+            'createUploadSession' for chunked uploads).
         :return: A formatted URL string.
         """
-        remote_path = remote_path.strip("/")
-        if action == 'content':
-            url = f"{self.GRAPH_BASE_URL}/sites/{self.site_id}/drive/root:/{remote_path}:/{action}"
-        else:
-            url = f"{self.GRAPH_BASE_URL}/sites/{self.site_id}/drive/root:/{remote_path}"
-        return url
+        remote_path = quote(remote_path.strip("/"), safe="/")
+        if action:
+            return f"{self._root_prefix}{remote_path}:/{action}"
+        return f"{self._root_prefix}{remote_path}"
 
     def _get_token(self, client_id, client_secret, tenant_id):
         authority_url = f'https://login.microsoftonline.com/{tenant_id}'
-        app = msal.ConfidentialClientApplication(
+        self._msal_app = msal.ConfidentialClientApplication(
             authority=authority_url,
             client_id=f'{client_id}',
             client_credential=f'{client_secret}'
         )
-        token = app.acquire_token_for_client(scopes=["https://graph.microsoft.com/.default"])
+        return self._acquire_token()
+
+    def _acquire_token(self) -> str:
+        # Served from MSAL's token cache until the cached token is close to expiry.
+        token = self._msal_app.acquire_token_for_client(scopes=self.GRAPH_SCOPES)
+        self._token_expires_at = time.monotonic() + int(token.get('expires_in', 0))
         return token['access_token']
 
-    def list_files(self, folder_path: str):
+    def _refresh_token(self, force: bool = False):
+        if force:
+            token_cache = self._msal_app.token_cache
+            # search() walks the cache's internal dict, so collect the entries before removing them.
+            for entry in list(token_cache.search(msal.TokenCache.CredentialType.ACCESS_TOKEN)):
+                token_cache.remove_at(entry)
+        try:
+            self.access_token = self._acquire_token()
+        except KeyError:
+            raise SecurityError("Access token not found, please check your credentials")
+        self.session.headers["Authorization"] = f"Bearer {self.access_token}"
+
+    @staticmethod
+    def _parse_json(response: requests.Response):
+        # Parse the raw body directly; orjson is used when installed, the stdlib otherwise.
+        # Decode failures are re-raised as requests' JSONDecodeError, a RequestException,
+        # as response.json() would.
+        try:
+            return _json_loads(response.content)
+        except ValueError as e:
+            raise requests.exceptions.JSONDecodeError(
+                getattr(e, "msg", str(e)), getattr(e, "doc", ""), getattr(e, "pos", 0)) from e
+
+    def _request(self, method: str, url: str, **kwargs) -> requests.Response:
+        if time.monotonic() >= self._token_expires_at - self.TOKEN_REFRESH_MARGIN:
+            self._refresh_token()
+        kwargs.setdefault("timeout", self.REQUEST_TIMEOUT)
+        body_position = self._body_position(kwargs)
+        response = self.session.request(method, url, **kwargs)
+        if response.status_code == 401 and self._msal_app is not None:
+            # The token may have been revoked before its expiry; fetch a new one and retry once.
+            self._refresh_token(force=True)
+            self._rewind_body(kwargs, body_position)
+            response = self.session.request(method, url, **kwargs)
+        return response
+
+    @staticmethod
+    def _body_position(kwargs: dict):
+        body = kwargs.get("data")
+        return body.tell() if hasattr(body, "seek") else None
+
+    @staticmethod
+    def _rewind_body(kwargs: dict, position):
+        # Streamed file bodies are consumed by the first attempt and must be re-read from the start.
+        if position is not None:
+            kwargs["data"].seek(position)
+
+    def list_files(self, folder_path: str, select: Sequence[str] | None = None, page_size: int | None = None):
         """
         Retrieves a list of files from a specified folder in a OneDrive account, using the
         Microsoft Graph API.
 
-        The function sends HTTP GET requests to fetch file metadata collection in the
-        provided folder path. Results are paginated through the Graph API `@odata.nextLink`
-        property, and the function iterates until all pages have been processed.
+        The function collects every item yielded by `iter_files`, so all result pages
+        are fetched before it returns.
 
         :param folder_path: The folder path in the OneDrive structure from which the files
             need to be listed.
         :type folder_path: str
+        :param select: DriveItem properties to return (Graph `$select`). Defaults to the
+            full item representation.
+        :type select: Sequence[str] | None
+        :param page_size: Number of items per result page (Graph `$top`).
+        :type page_size: int | None
         :return: A list containing metadata of files from the folder. Each file's data is
             represented as a dictionary.
         :rtype: list
         :raises HTTPError: If there is a networking issue or the API request fails.
         :raises JSONDecodeError: If the API returns invalid JSON in the body.
         """
-        folder_path = folder_path.strip("/")
+        return list(self.iter_files(folder_path, select, page_size))
+
+    def iter_files(self, folder_path: str, select: Sequence[str] | None = None,
+                   page_size: int | None = None) -> Iterator[dict]:
+        """
+        Lazily yields the files of a specified folder in a OneDrive account, using the
+        Microsoft Graph API.
+
+        The function sends HTTP GET requests to fetch file metadata collection in the
+        provided folder path. Results are paginated through the Graph API `@odata.nextLink`
+        property; the next page is only requested once the caller has consumed the
+        current one, so callers can stop early without fetching the remaining pages.
 
-        url = f"{self.GRAPH_BASE_URL}/drives/{self.documents_id}/root:/{folder_path}:/children"
-        files = []
-        while True:
-            response = requests.get(url, headers=self.headers)
+        Restricting `select` to the properties actually needed shrinks every page. Selecting
+        `@microsoft.graph.downloadUrl` returns download links directly, avoiding a metadata
+        request per file before downloading.
+
+        :param folder_path: The folder path in the OneDrive structure from which the files
+            need to be listed.
+        :type folder_path: str
+        :param select: DriveItem properties to return (Graph `$select`), e.g.
+            `("id", "name", "size", "@microsoft.graph.downloadUrl")`. Defaults to the full
+            item representation.
+        :type select: Sequence[str] | None
+        :param page_size: Number of items per result page (Graph `$top`).
+        :type page_size: int | None
+        :return: An iterator over the metadata dictionaries of the files in the folder.
+        :rtype: Iterator[dict]
+        :raises HTTPError: If there is a networking issue or the API request fails.
+        :raises JSONDecodeError: If the API returns invalid JSON in the body.
+        """
+        url = self._drive_children_tmpl.format(path=quote(folder_path.strip("/"), safe="/"))
+        params = {}
+        if select:
+            params["$select"] = ",".join(select)
+        if page_size:
+            params["$top"] = page_size
+        while url:
+            response = self._retry_request("GET", url, params=params or None)
             response.raise_for_status()  # Raise exception for non-200 status codes
 
-            data = response.json()
-            files.extend(data.get("value", []))
-            if '@odata.nextLink' in data:
-                url = data['@odata.nextLink']
-            else:
-                break
-        return files
+            data = self._parse_json(response)
+            yield from data.get("value", [])
+            url = data.get('@odata.nextLink')
+            params = None  # The next link already carries the query options
 
     def upload_file_by_relative_path(self, remote_path, local_path):
         """
         Uploads a file to a remote location specified by its relative path. The
-        file content is read from the local file system and then uploaded to the
+        file content is streamed from the local file system and uploaded to the
         remote server using an HTTP PUT request.
 
-        The method constructs the URL based on the provided remote path and uses
-        the configured headers to authenticate the request.
+        Files larger than `SIMPLE_UPLOAD_LIMIT` are sent through a Graph upload
+        session in `UPLOAD_CHUNK_SIZE` byte ranges, so memory use stays bounded by
+        a single chunk.
 
         :param remote_path: Relative path on the remote server where the file
             will be uploaded. Include the file name and extension.
@@ -156,11 +333,50 @@ class SharePointGraphql:
         :type local_path: str
         :return: None
         """
+        file_size = os.path.getsize(local_path)
+        if file_size > self.SIMPLE_UPLOAD_LIMIT:
+            self._upload_in_chunks(remote_path, local_path, file_size)
+            return
+
         with open(local_path, "rb") as f:
             url = self._build_graph_url(remote_path, "content")
-            response = requests.put(url, headers=self.headers, stream=True, data=f.read())
+            # requests sends an empty file handle chunked, without a Content-Length.
+            response = self._retry_request("PUT", url, data=f if file_size else b"")
         response.raise_for_status()
 
+    def _upload_in_chunks(self, remote_path, local_path, file_size: int):
+        url = self._build_graph_url(remote_path, "createUploadSession")
+        response = self._retry_request("POST", url, json={"item": {"@microsoft.graph.conflictBehavior": "replace"}})
+        response.raise_for_status()
+        upload_url = self._parse_json(response)["uploadUrl"]
+
+        with open(local_path, "rb") as f:
+            for start in range(0, file_size, self.UPLOAD_CHUNK_SIZE):
+                chunk = f.read(self.UPLOAD_CHUNK_SIZE)
+                end = start + len(chunk) - 1
+                # Upload URLs are pre-authenticated and reject requests carrying the bearer token.
+                headers = {**self._PRE_AUTHENTICATED_HEADERS, "Content-Range": f"bytes {start}-{end}/{file_size}"}
+                response = self._retry_request("PUT", upload_url, data=chunk, headers=headers)
+                response.raise_for_status()
+
+    def upload_many(self, pairs, max_workers: int = 8):
+        """
+        Uploads several files concurrently, one worker thread per in-flight upload.
+
+        Each pair is passed to `upload_file_by_relative_path`. The workers share the
+        pooled session, so connections are reused across files. The pool is grown to
+        at least `max_workers` connections.
+
+        :param pairs: Iterable of `(remote_path, local_path)` tuples.
+        :type pairs: Iterable[tuple[str, str]]
+        :param max_workers: Maximum number of uploads in flight at once.
+        :type max_workers: int
+        :return: None
+        :raises requests.exceptions.HTTPError: If any of the uploads fails.
+        """
+        self._ensure_pool_capacity(max_workers)
+        self._run_concurrently(self.upload_file_by_relative_path, pairs, max_workers)
+
     def move_file(self, remote_src_path, remote_des_path):
         """
         Moves a file from a source location to a destination location on a remote server.
@@ -186,7 +402,7 @@ class SharePointGraphql:
         new_filename = os.path.basename(remote_des_path)
         path = os.path.dirname(remote_des_path)
         # Construct the path reference
-        path_reference = f"drives/{self.documents_id}/root:/{path}"
+        path_reference = self._move_parent_tmpl.format(path=path)
         # Payload for the move request
         payload = {
             "parentReference": {
@@ -197,8 +413,8 @@ class SharePointGraphql:
         return payload
 
     def _execute_move_request(self, payload, remote_src_path):
-        response = requests.patch(self._build_graph_url(remote_src_path), headers=self.headers, stream=True,
-                                  json=payload)
+        response = self._retry_request("PATCH", self._build_graph_url(remote_src_path), stream=True,
+                                       json=payload)
         response.raise_for_status()
 
     def delete_file_by_relative_path(self, remote_path: str):
@@ -214,11 +430,126 @@ class SharePointGraphql:
         """
 
         try:
-            response = requests.delete(self._build_graph_url(remote_path), headers=self.headers)
+            response = self._retry_request("DELETE", self._build_graph_url(remote_path))
             response.raise_for_status()
         except requests.exceptions.HTTPError as e:
             raise TransactionError(f"Error deleting file: {e}")
 
+    def delete_many(self, remote_paths):
+        """
+        Deletes several files with Microsoft Graph JSON batching.
+
+        Up to `BATCH_SIZE` deletions travel in a single HTTP round trip.
+
+        :param remote_paths: Relative paths of the files to delete on the SharePoint site.
+        :type remote_paths: Iterable[str]
+        :return: None
+        :raises TransactionError: If the batch request fails or any deletion is rejected.
+        """
+        remote_paths = list(remote_paths)
+        sub_requests = [
+            {"method": "DELETE", "url": self._relative_graph_url(self._build_graph_url(remote_path))}
+            for remote_path in remote_paths
+        ]
+        self._raise_for_batch_failures("deleting", remote_paths, self.batch(sub_requests))
+
+    def move_many(self, pairs):
+        """
+        Moves several files with Microsoft Graph JSON batching.
+
+        Up to `BATCH_SIZE` moves travel in a single HTTP round trip.
+
+        :param pairs: Iterable of `(remote_src_path, remote_des_path)` tuples.
+        :type pairs: Iterable[tuple[str, str]]
+        :return: None
+        :raises TransactionError: If the batch request fails or any move is rejected.
+        """
+        pairs = list(pairs)
+        sub_requests = [
+            {
+                "method": "PATCH",
+                "url": self._relative_graph_url(self._build_graph_url(remote_src_path)),
+                "body": self._build_move_destination_payload(remote_des_path),
+            }
+            for remote_src_path, remote_des_path in pairs
+        ]
+        self._raise_for_batch_failures("moving", [src for src, _ in pairs], self.batch(sub_requests))
+
+    def batch(self, sub_requests: list[dict]) -> list[dict]:
+        """
+        Sends Microsoft Graph sub-requests through the `$batch` endpoint.
+
+        Sub-requests are split into chunks of `BATCH_SIZE`, the limit accepted by Graph.
+        Sub-requests throttled with a 429 status are re-sent after the largest
+        `Retry-After` value reported, up to `BATCH_MAX_ATTEMPTS` times.
+
+        :param sub_requests: Dictionaries with a `method`, a `url` relative to
+            `GRAPH_BASE_URL`, and optionally a JSON `body` and `headers`.
+        :type sub_requests: list[dict]
+        :return: The sub-responses (`id`, `status`, `headers`, `body`) in the same
+            order as `sub_requests`.
+        :rtype: list[dict]
+        :raises TransactionError: If the batch request itself fails.
+        """
+        pending = {
+            str(index): self._build_batch_entry(str(index), sub_request)
+            for index, sub_request in enumerate(sub_requests)
+        }
+        responses = {}
+        for attempt in range(self.BATCH_MAX_ATTEMPTS):
+            throttled = {}
+            retry_after = 0
+            ids = list(pending)
+            for start in range(0, len(ids), self.BATCH_SIZE):
+                chunk = [pending[request_id] for request_id in ids[start:start + self.BATCH_SIZE]]
+                for sub_response in self._post_batch(chunk):
+                    request_id = sub_response["id"]
+                    if sub_response["status"] == 429 and attempt < self.BATCH_MAX_ATTEMPTS - 1:
+                        throttled[request_id] = pending[request_id]
+                        headers = sub_response.get("headers", {})
+                        delay = self._parse_retry_after(headers.get("Retry-After"))
+                        retry_after = max(retry_after, 1.0 if delay is None else delay)
+                    else:
+                        responses[request_id] = sub_response
+            if not throttled:
+                break
+            time.sleep(retry_after)
+            pending = throttled
+        return [responses[str(index)] for index in range(len(sub_requests))]
+
+    def _post_batch(self, entries: list[dict]) -> list[dict]:
+        # Sent once: Graph may already have run the sub-requests when the POST fails, so a
+        # replay could fail work that succeeded. Throttled sub-requests are retried by batch().
+        try:
+            response = self._request("POST", f"{self.GRAPH_BASE_URL}/$batch", json={"requests": entries})
+            response.raise_for_status()
+        except requests.exceptions.RequestException as e:
+            raise TransactionError(f"Error executing batch request: {e}")
+        return self._parse_json(response)["responses"]
+
+    @staticmethod
+    def _build_batch_entry(request_id: str, sub_request: dict) -> dict:
+        entry = {"id": request_id, "method": sub_request["method"], "url": sub_request["url"]}
+        if "body" in sub_request:
+            entry["body"] = sub_request["body"]
+            entry["headers"] = {"Content-Type": "application/json", **sub_request.get("headers", {})}
+        elif "headers" in sub_request:
+            entry["headers"] = sub_request["headers"]
+        return entry
+
+    def _relative_graph_url(self, url: str) -> str:
+        return url[len(self.GRAPH_BASE_URL):]
+
+    @staticmethod
+    def _raise_for_batch_failures(action: str, remote_paths: list, sub_responses: list[dict]):
+        failures = [
+            f"{remote_path} ({sub_response['status']})"
+            for remote_path, sub_response in zip(remote_paths, sub_responses)
+            if sub_response["status"] >= 400
+        ]
+        if failures:
+            raise TransactionError(f"Error {action} files: {', '.join(failures)}")
+
     @staticmethod
     def _setup_local_directory(output_path: os.PathLike) -> PathLike:
         output_path = SharePointGraphql._resolve_absolute_path(output_path)
@@ -233,11 +564,10 @@ class SharePointGraphql:
 
     @staticmethod
     def _ensure_directory_exists(output_path: os.PathLike):
-        output_dir = os.path.dirname(output_path)
-        if not os.path.exists(output_dir):
-            os.makedirs(output_dir)
+        # exist_ok avoids a separate exists() check and the race between the two calls.
+        os.makedirs(os.path.dirname(output_path), exist_ok=True)
 
-    def download_file(self, url: str, output_path: os.PathLike):
+    def download_file(self, url: str, output_path: os.PathLike, max_parts: int = DOWNLOAD_PARTS):
         """
         Downloads a file from a specified URL and saves it to the given path.
 
@@ -245,25 +575,80 @@ class SharePointGraphql:
         path. A directory is setup or verified before storing the file. The function streams
         the data in chunks to handle large files efficiently.
 
+        When the server accepts byte ranges and the file is at least
+        `RANGED_DOWNLOAD_THRESHOLD` bytes, the file is split into `max_parts` ranges
+        that are fetched in parallel and written at their offsets.
+
         :param url: The URL of the file to download.
         :type url: str
         :param output_path: The destination local path to save the downloaded file. This can
                            be a file path string or any object implementing os.PathLike.
         :type output_path: os.PathLike
+        :param max_parts: Maximum number of ranges fetched in parallel. Use 1 to always
+            download over a single connection.
+        :type max_parts: int
         :return: None
         :rtype: None
         :raises TransactionError: If there is an HTTP error during the file download.
         """
         try:
-            response = requests.get(url, stream=True)
+            # Download URLs are pre-authenticated, so the bearer token is not sent to them.
+            response = self._retry_request("GET", url, stream=True, headers=self._PRE_AUTHENTICATED_HEADERS)
             response.raise_for_status()  # Raise an exception for non-2xx status codes
         except requests.exceptions.HTTPError as e:
             raise TransactionError(f"Error downloading file: {e}")
 
-        with open(self._setup_local_directory(output_path), "wb") as f:
-            for chunk in response.iter_content(chunk_size=1024):
-                if chunk:
-                    f.write(chunk)
+        output_path = self._setup_local_directory(output_path)
+        file_size = self._ranged_download_size(response)
+        if max_parts > 1 and file_size >= self.RANGED_DOWNLOAD_THRESHOLD:
+            response.close()
+            self._download_in_ranges(url, output_path, file_size, max_parts)
+            return
+
+        with open(output_path, "wb") as f:
+            self._copy_response_body(response, f)
+
+    @staticmethod
+    def _ranged_download_size(response: requests.Response) -> int:
+        headers = response.headers
+        if headers.get("Accept-Ranges") != "bytes" or "Content-Encoding" in headers:
+            return 0
+        return int(headers.get("Content-Length", 0))
+
+    def _download_in_ranges(self, url: str, output_path: os.PathLike, file_size: int, max_parts: int):
+        with open(output_path, "wb") as f:
+            f.truncate(file_size)
+
+        part_size = -(-file_size // max_parts)
+        ranges = [
+            (url, output_path, start, min(start + part_size, file_size) - 1)
+            for start in range(0, file_size, part_size)
+        ]
+        try:
+            self._run_concurrently(self._download_range, ranges, max_parts)
+        except BaseException:
+            # The file is pre-sized, so a partial download would look complete.
+            os.remove(output_path)
+            raise
+
+    def _download_range(self, url: str, output_path: os.PathLike, start: int, end: int):
+        headers = {**self._PRE_AUTHENTICATED_HEADERS, "Range": f"bytes={start}-{end}"}
+        try:
+            response = self._retry_request("GET", url, stream=True, headers=headers)
+            response.raise_for_status()
+        except requests.exceptions.HTTPError as e:
+            raise TransactionError(f"Error downloading file: {e}")
+        if response.status_code != 206:
+            raise TransactionError(f"Error downloading file: range {start}-{end} was not honoured")
+
+        with open(output_path, "r+b") as f:
+            f.seek(start)
+            self._copy_response_body(response, f)
+
+    def _copy_response_body(self, response: requests.Response, f):
+        # Copy straight from the socket in large blocks; decode_content undoes any gzip transfer encoding.
+        response.raw.decode_content = True
+        shutil.copyfileobj(response.raw, f, length=self.DOWNLOAD_CHUNK_SIZE)
 
     def is_valid_url(self, url: str) -> bool:
         """
@@ -281,24 +666,41 @@ class SharePointGraphql:
         except Exception:
             return False
 
-    def download_filestream(self, remote_file_path: str) -> StringIO:
+    def download_filestream(self, remote_file_path: str) -> BytesIO:
         """
-        Downloads a file from a specified URL and returns the response object.
+        Downloads a file into memory and returns it as a binary stream.
+
+        The content is kept as raw bytes, so binary files such as xlsx or pdf are
+        returned unchanged. Use `download_textstream` to read text files.
 
         :param remote_file_path: The file path of the file to download.
         :type remote_file_path: str
-        :return: A file object if download is successful.
-        :rtype: StringIO
+        :return: A binary file object positioned at the start of the content.
+        :rtype: BytesIO
         :raises TransactionError: If there is an issue with the HTTP request.
         """
         url = self._build_graph_url(remote_file_path)
         download_url = self._get_download_url(url)
         return self._download_to_stream(download_url)
 
+    def download_textstream(self, remote_file_path: str, encoding: str = "utf-8") -> TextIOWrapper:
+        """
+        Downloads a text file into memory and returns it as a text stream.
+
+        :param remote_file_path: The file path of the file to download.
+        :type remote_file_path: str
+        :param encoding: The text encoding of the file.
+        :type encoding: str
+        :return: A text file object positioned at the start of the content.
+        :rtype: TextIOWrapper
+        :raises TransactionError: If there is an issue with the HTTP request.
+        """
+        return TextIOWrapper(self.download_filestream(remote_file_path), encoding=encoding)
+
     def _get_download_url(self, url: str) -> str:
         try:
-            response = self._retry_request("GET", url, headers=self.headers)
-            response_data = response.json()
+            response = self._retry_request("GET", url)
+            response_data = self._parse_json(response)
             download_url = response_data[self.DOWNLOAD_URL_KEY]
             if not self.is_valid_url(download_url):
                 raise TransactionError(f"Invalid download URL: {download_url}")
@@ -306,43 +708,132 @@ class SharePointGraphql:
         except requests.exceptions.RequestException as e:
             raise TransactionError(f"Error retrieving file metadata: {e}")
 
-    def _download_to_stream(self, download_url: str) -> StringIO:
+    def _download_to_stream(self, download_url: str) -> BytesIO:
         try:
-            response = self._retry_request("GET", download_url, stream=True)
-            file_stream = StringIO()
-            file_stream.write(response.content.decode("utf-8"))
-            file_stream.seek(0)
-            return file_stream
+            response = self._retry_request("GET", download_url, stream=True, headers=self._PRE_AUTHENTICATED_HEADERS)
+            response.raise_for_status()
+            file_stream = BytesIO()
+            self._copy_response_body(response, file_stream)
         except requests.exceptions.RequestException as e:
             raise TransactionError(f"Error downloading file: {e}")
+        file_stream.seek(0)
+        return file_stream
 
     def _retry_request(self, method: str, url: str, **kwargs) -> requests.Response:
-        for _ in range(3):  # Retry up to 3 times
-            response = requests.request(method, url, **kwargs)
-            if response.status_code < 500:  # Retry only for server errors
+        body_position = self._body_position(kwargs)
+        for attempt in range(self.MAX_RETRIES + 1):
+            self._rewind_body(kwargs, body_position)
+            try:
+                response = self._request(method, url, **kwargs)
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
+                if attempt == self.MAX_RETRIES:
+                    raise
+                time.sleep(self._backoff_delay(attempt))
+                continue
+            if response.status_code not in self.RETRY_STATUS_CODES:
                 return response
-            time.sleep(5)  # Delay between retries
+            if attempt < self.MAX_RETRIES:
+                # Release the connection of a discarded (possibly streamed) response before waiting.
+                response.close()
+                time.sleep(self._retry_delay(response, attempt))
         response.raise_for_status()
+        return response
+
+    def _retry_delay(self, response: requests.Response, attempt: int) -> float:
+        if response.status_code in (429, 503):
+            retry_after = self._parse_retry_after(response.headers.get("Retry-After"))
+            if retry_after is not None:
+                return retry_after
+        return self._backoff_delay(attempt)
 
-    def download_file_by_relative_path(self, remote_path: str, local_path: os.PathLike):
+    @staticmethod
+    def _parse_retry_after(value: str | None) -> float | None:
+        # Retry-After is either a number of seconds or an HTTP date; None when absent or unparseable.
+        if not value:
+            return None
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            pass
+        try:
+            retry_at = parsedate_to_datetime(value)
+        except (TypeError, ValueError):
+            return None
+        if retry_at.tzinfo is None:
+            # A "-0000" zone parses to a naive datetime; HTTP dates are always UTC.
+            retry_at = retry_at.replace(tzinfo=timezone.utc)
+        return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+    def _backoff_delay(self, attempt: int) -> float:
+        # Exponential backoff with jitter keeps concurrent clients from retrying in lockstep.
+        delay = min(self.RETRY_BACKOFF_MAX, self.RETRY_BACKOFF_BASE * 2 ** attempt)
+        return delay + random.uniform(0, self.RETRY_BACKOFF_BASE)
+
+    def download_many(self, pairs, max_workers: int = 8, prefetch_url: bool = False):
+        """
+        Downloads several files concurrently, one worker thread per in-flight download.
+
+        Each pair is passed to `download_file_by_relative_path`. The workers share the
+        pooled session, so connections are reused across files. The pool is grown to
+        cover every worker, including the parallel ranges of large files when
+        `prefetch_url` is set.
+
+        :param pairs: Iterable of `(remote_path, local_path)` tuples.
+        :type pairs: Iterable[tuple[str, os.PathLike]]
+        :param max_workers: Maximum number of downloads in flight at once.
+        :type max_workers: int
+        :param prefetch_url: Passed through to `download_file_by_relative_path`.
+        :type prefetch_url: bool
+        :return: None
+        :raises requests.exceptions.RequestException: If a request for any of the files fails.
+        :raises TransactionError: If fetching a prefetched download URL fails.
+        :raises KeyError: If a prefetched download URL is missing from the API response.
+        """
+        self._ensure_pool_capacity(max_workers * self.DOWNLOAD_PARTS if prefetch_url else max_workers)
+        pairs = [(remote_path, local_path, prefetch_url) for remote_path, local_path in pairs]
+        self._run_concurrently(self.download_file_by_relative_path, pairs, max_workers)
+
+    @staticmethod
+    def _run_concurrently(func, argument_tuples, max_workers: int) -> list:
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = [executor.submit(func, *args) for args in argument_tuples]
+            try:
+                return [future.result() for future in futures]
+            except BaseException:
+                # Drop the queued tasks so a failure is reported without transferring the rest.
+                executor.shutdown(wait=True, cancel_futures=True)
+                raise
+
+    def download_file_by_relative_path(self, remote_path: str, local_path: os.PathLike, prefetch_url: bool = False):
         """
             Downloads a file from the SharePoint site by its relative path.
 
-            This method retrieves the file's download URL using the Microsoft Graph API
-            and then downloads the file to the specified local path.
+            By default this method requests the item's `/content` endpoint, which redirects
+            straight to the file, so the download costs a single round trip. With
+            `prefetch_url` it first retrieves the file's download URL using the Microsoft
+            Graph API and then downloads it with `download_file`, which allows the URL to be
+            inspected and large files to be fetched as parallel ranges.
 
             Args:
                 remote_path: The relative path of the file on the SharePoint site.
                 local_path: The local file path where the downloaded file should be saved.
+                prefetch_url: Resolve the download URL with a separate metadata request first.
 
             Raises:
                 KeyError: If the download URL is not found in the API response.
                 requests.exceptions.RequestException: If there is an issue with the HTTP request.
         """
+        if not prefetch_url:
+            # requests drops the bearer token when following the redirect to another host.
+            response = self._retry_request("GET", self._build_graph_url(remote_path, "content"), stream=True)
+            response.raise_for_status()
+            with open(self._setup_local_directory(local_path), "wb") as f:
+                self._copy_response_body(response, f)
+            return
 
-        response = requests.get(self._build_graph_url(remote_path), headers=self.headers)
+        response = self._retry_request("GET", self._build_graph_url(remote_path))
         response.raise_for_status()
-        data = response.json()
+        data = self._parse_json(response)
 
         if self.DOWNLOAD_URL_KEY not in data:
             raise KeyError("Download URL not found in response")
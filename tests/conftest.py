@@ -0,0 +1,58 @@
+import pytest
+import responses
+
+from sharepoint_graphql import SharePointGraphql
+from tests.helpers import patch_lookups
+
+
+@pytest.fixture(scope="session", autouse=True)
+def http_registry():
+    # A single RequestsMock intercepts every request made through requests for the whole
+    # run, so no test can reach the network; unregistered URLs raise ConnectionError.
+    with responses.RequestsMock(assert_all_requests_are_fired=False) as registry:
+        yield registry
+
+
+@pytest.fixture
+def mock_http(http_registry):
+    """Yields the shared `responses` registry and clears its URLs and calls after the test."""
+    yield http_registry
+    http_registry.reset()
+
+
+@pytest.fixture(scope="session")
+def mock_client():
+    return {
+        "site_url": "https://mycompany.sharepoint.com/sites/warehouse",
+        "tenant_id": "test_tenant",
+        "client_id": "test_client",
+        "client_secret": "test_secret"
+    }
+
+
+@pytest.fixture(scope="session")
+def sp_template(mock_client):
+    """
+    Builds one fully mocked client per session; fixtures hand out shallow copies of it.
+
+    Only the constructor's token and id lookups are patched, and only while it runs.
+    Copies share the template's session, so tests must not mutate it in place.
+    """
+    restore = patch_lookups()
+    try:
+        return SharePointGraphql(**mock_client)
+    finally:
+        restore()
+
+
+@pytest.fixture
+def mock_lookups():
+    """Patches the constructor's token and id lookups for tests that build their own client."""
+    restore = patch_lookups()
+    yield
+    restore()
+
+
+@pytest.fixture(scope="session")
+def mock_error_message():
+    return "An error occurred"
@@ -0,0 +1,40 @@
+import inspect
+from unittest.mock import MagicMock
+
+from sharepoint_graphql import SharePointGraphql
+
+# Values returned by the patched constructor lookups.
+MOCKS = {
+    "token": "mock_access_token",
+    "site_id": "mock_site_id",
+    "documents_id": "mock_documents_id",
+}
+
+
+def patch_attributes(target, **attributes):
+    """
+    Sets `attributes` on `target` and returns a callable that puts the originals back.
+
+    The originals are kept in a local list and restored in reverse order, so fixtures can
+    patch without going through MonkeyPatch and its undo stack.
+    """
+    originals = []
+    for name, value in attributes.items():
+        originals.append((name, inspect.getattr_static(target, name)))
+        setattr(target, name, value)
+
+    def restore():
+        for name, value in reversed(originals):
+            setattr(target, name, value)
+
+    return restore
+
+
+def patch_lookups():
+    """Patches the constructor's token and id lookups to return `MOCKS`; returns the restore callable."""
+    return patch_attributes(
+        SharePointGraphql,
+        _get_token=MagicMock(return_value=MOCKS["token"]),
+        _get_site_id=MagicMock(return_value=MOCKS["site_id"]),
+        _get_document_id=MagicMock(return_value=MOCKS["documents_id"]),
+    )
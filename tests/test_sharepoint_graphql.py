@@ -1,164 +1,59 @@
+import copy
 import json
 import os
 import pathlib
-from io import TextIOWrapper
-from unittest.mock import MagicMock
+import time
+from contextlib import nullcontext
+from io import BytesIO
+from types import SimpleNamespace
+from unittest.mock import MagicMock, call
 
+import msal
 import pytest
 import requests
+import responses
+from responses import matchers
 
 from sharepoint_graphql import SecurityError, ConnectionError, TransactionError, SharePointGraphql
+from tests.helpers import MOCKS, patch_attributes
 
+_ME_URL = f"{SharePointGraphql.GRAPH_BASE_URL}/me"
+_BATCH_URL = f"{SharePointGraphql.GRAPH_BASE_URL}/$batch"
+_DRIVE_URL = f"{SharePointGraphql.GRAPH_BASE_URL}/sites/{MOCKS['site_id']}/drive/"
+_LIST_CHILDREN_URL = f"{SharePointGraphql.GRAPH_BASE_URL}/drives/{MOCKS['documents_id']}/root:/Documents/Folder:/children"
+_NEXT_PAGE_URL = f"{SharePointGraphql.GRAPH_BASE_URL}/nextPage"
 
-class MockResponse:
-    def __init__(self, json_data, status_code):
-        self.json_data = json_data
-        self.status_code = status_code
-
-    def json(self):
-        return self.json_data
-
-    @property
-    def text(self):
-        return json.dumps(self.json_data)
-
-    def raise_for_status(self):
-        if self.status_code != 200:
-            raise ConnectionError("Mocked error")
-
-
-class MockResponseTransactionError:
-    def __init__(self, json_data, status_code):
-        self.json_data = json_data
-        self.status_code = status_code
-
-    def json(self):
-        return self.json_data
-
-    @property
-    def text(self):
-        return json.dumps(self.json_data)
-
-    def raise_for_status(self):
-        if self.status_code != 200:
-            raise requests.exceptions.HTTPError("Mocked error")
-
-
-@pytest.fixture
-def mock_client():
-    return {
-        "site_url": "https://mycompany.sharepoint.com/sites/warehouse",
-        "tenant_id": "test_tenant",
-        "client_id": "test_client",
-        "client_secret": "test_secret"
-    }
-
-
-# @pytest.fixture
-# def mock_client_failure():
-#     return {
-#         "site_url": "https://mycompany.sharepoint.com/sites/warehouse",
-#         "tenant_id": "test_tenant",
-#         "client_id": "test_client",
-#         "client_secret": "test_secret"
-#     }
-
-
-@pytest.fixture
-def mock_error_message():
-    return "An error occurred"
-
-
-@pytest.fixture
-def mock_object(mock_client, monkeypatch):
-    mock_token = "mock_access_token"
-    # mock_site_url = "mock_graph_site_url"
-    mock_site_id = "mock_site_id"
-    mock_documents_id = "mock_documents_id"
-
-    monkeypatch.setattr(SharePointGraphql, "_get_token", MagicMock(return_value=mock_token))
-    # monkeypatch.setattr(SharePointGraphql, "_convert_site_url_to_graph_format", MagicMock(return_value=mock_site_url))
-    monkeypatch.setattr(SharePointGraphql, "_get_site_id", MagicMock(return_value=mock_site_id))
-    monkeypatch.setattr(SharePointGraphql, "_get_document_id", MagicMock(return_value=mock_documents_id))
-
-    sharepoint_graphql = SharePointGraphql(**mock_client)
-    return sharepoint_graphql
-
-
-@pytest.fixture
-def mock_object_for_testing_site_id(mock_client, monkeypatch):
-    mock_token = "mock_access_token"
-    mock_site_url = "mock_graph_site_url"
-    # mock_site_id = "mock_site_id"
-    mock_documents_id = "mock_documents_id"
-
-    monkeypatch.setattr(SharePointGraphql, "_get_token", MagicMock(return_value=mock_token))
-    monkeypatch.setattr(SharePointGraphql, "_convert_site_url_to_graph_format", MagicMock(return_value=mock_site_url))
-    # monkeypatch.setattr(SharePointGraphql, "_get_site_id", MagicMock(return_value=mock_site_id))
-    monkeypatch.setattr(SharePointGraphql, "_get_document_id", MagicMock(return_value=mock_documents_id))
-
-    mock_response = {
-        "id": "mock_site_id"
-    }
-
-    def mock_get(url, headers):
-        print(f"Mocked GET request to URL: {url} with headers: {headers}")
-        return MockResponse(mock_response, 200)
-
-    monkeypatch.setattr("requests.get", mock_get)
-
-    sharepoint_graphql = SharePointGraphql(**mock_client)
-    return sharepoint_graphql
-
-
-@pytest.fixture
-def mock_object_for_testing_document_id(mock_client, monkeypatch):
-    mock_token = "mock_access_token"
-    # mock_site_url = "mock_graph_site_url"
-    mock_site_id = "mock_site_id"
-    mock_documents_id = "mock_documents_id"
-
-    mock_response = {
-        "id": mock_documents_id,
-    }
-
-    def mock_get(url, headers):
-        print(f"Mocked GET request to URL: {url} with headers: {headers}")
-        return MockResponse(mock_response, 200)
-
-    monkeypatch.setattr("requests.get", mock_get)
-
-    monkeypatch.setattr(SharePointGraphql, "_get_token", MagicMock(return_value=mock_token))
-    # monkeypatch.setattr(SharePointGraphql, "_convert_site_url_to_graph_format", MagicMock(return_value=mock_site_url))
-    monkeypatch.setattr(SharePointGraphql, "_get_site_id", MagicMock(return_value=mock_site_id))
-    # monkeypatch.setattr(SharePointGraphql, "_get_document_id", MagicMock(return_value=mock_documents_id))
-
-    sharepoint_graphql = SharePointGraphql(**mock_client)
-    return sharepoint_graphql
+_FULL_PATH = pathlib.PurePath("/root/Folder")
+_PARTIAL_PATH = pathlib.PurePath("Folder")
+_OUTPUT_PATH = pathlib.PurePath("test_directory/test_file.txt")
 
 
 @pytest.fixture
-def mock_object_for_testing_token(mock_client, monkeypatch):
-    # mock_token = "mock_access_token"
-    mock_site_url = "mock_graph_site_url"
-    mock_site_id = "mock_site_id"
-    mock_documents_id = "mock_documents_id"
-
-    class MockConfidentialClientApplication:
-        def __init__(self, authority, client_id, client_credential):
-            pass
-
-        def acquire_token_for_client(self, scopes):
-            return {"access_token": "mock_access_token"}
-
-    monkeypatch.setattr("msal.ConfidentialClientApplication", MockConfidentialClientApplication)
-
-    # monkeypatch.setattr(SharePointGraphql, "_get_token", MagicMock(return_value=mock_token))
-    monkeypatch.setattr(SharePointGraphql, "_convert_site_url_to_graph_format", MagicMock(return_value=mock_site_url))
-    monkeypatch.setattr(SharePointGraphql, "_get_site_id", MagicMock(return_value=mock_site_id))
-    monkeypatch.setattr(SharePointGraphql, "_get_document_id", MagicMock(return_value=mock_documents_id))
-
-    sharepoint_graphql = SharePointGraphql(**mock_client)
+def sp(request, mock_client, sp_template):
+    """
+    Returns a copy of the session template. Tests pick a variant through indirect
+    parametrization: "all" (the default) or "skip_token".
+
+    The template's lookups are only patched while its constructor runs, so every copy
+    calls the real `_get_site_id` and `_get_document_id`; "skip_token" acquires its
+    token through the real `_get_token` against a stubbed msal client.
+    """
+    variant = getattr(request, "param", "all")
+    if variant not in ("all", "skip_token"):
+        pytest.fail(f"Unknown sp fixture variant: {variant!r}")
+    sharepoint_graphql = copy.copy(sp_template)
+    if variant == "skip_token":
+        request.addfinalizer(patch_attributes(
+            msal,
+            ConfidentialClientApplication=lambda authority, client_id, client_credential: SimpleNamespace(
+                acquire_token_for_client=lambda scopes: {"access_token": MOCKS["token"], "expires_in": 3600},
+            ),
+        ))
+        # Token refreshes rewrite the Authorization header, so this copy gets a session of its own.
+        sharepoint_graphql.session = sharepoint_graphql._create_session()
+        sharepoint_graphql.access_token = sharepoint_graphql._get_token(
+            mock_client["client_id"], mock_client["client_secret"], mock_client["tenant_id"])
+        sharepoint_graphql.session.headers["Authorization"] = f"Bearer {sharepoint_graphql.access_token}"
     return sharepoint_graphql
 
 
@@ -186,10 +81,18 @@ def test_securityerror_handling(mock_error_message):
     assert str(exc_info.value) == mock_error_message
 
 
+@pytest.mark.parametrize("error_class", [ConnectionError, SecurityError, TransactionError])
+def test_error_construction_has_no_side_effects(error_class, mock_error_message, capsys):
+    # Act
+    error = error_class(mock_error_message)
+
+    # Assert
+    assert str(error) == mock_error_message
+    assert capsys.readouterr().out == ""
+
+
 def test_sharepoint_graphql_instantiation_with_invalid_mocked_token(mock_client, monkeypatch):
     # Arrange
-    # mock_token = "mock_access_token"
-
     def mock_get_token(self, client_id, client_secret, tenant_id):
         raise KeyError("Access token not found, please check your credentials")
 
@@ -202,115 +105,79 @@ def test_sharepoint_graphql_instantiation_with_invalid_mocked_token(mock_client,
         SharePointGraphql(**mock_client)
 
 
-def test_sharepoint_graphql_instantiation_with_mocked_token(mock_client, monkeypatch):
-    # Arrange
-    mock_token = "mock_access_token"
-    mock_site_url = "mock_graph_site_url"
-    mock_site_id = "mock_site_id"
-    mock_documents_id = "mock_documents_id"
-
-    # def mock_get_token(self, client_id, client_secret, tenant_id):
-    #     return mock_token
-
-    monkeypatch.setattr(SharePointGraphql, "_get_token", MagicMock(return_value=mock_token))
-    monkeypatch.setattr(SharePointGraphql, "_convert_site_url_to_graph_format", MagicMock(return_value=mock_site_url))
-    monkeypatch.setattr(SharePointGraphql, "_get_site_id", MagicMock(return_value=mock_site_id))
-    monkeypatch.setattr(SharePointGraphql, "_get_document_id", MagicMock(return_value=mock_documents_id))
-
-    # Act
-    sharepoint_graphql = SharePointGraphql(**mock_client)
-
+@pytest.mark.parametrize("attribute, expected", [
+    ("access_token", MOCKS["token"]),
+    ("site_url", "mycompany.sharepoint.com:/sites/warehouse:/"),
+    ("site_id", MOCKS["site_id"]),
+    ("documents_id", MOCKS["documents_id"]),
+])
+def test_sharepoint_graphql_instantiation_with_mocked_token(sp_template, attribute, expected):
     # Assert
-    assert sharepoint_graphql.access_token == mock_token
-    assert sharepoint_graphql.site_url == mock_site_url
-    assert sharepoint_graphql.site_id == mock_site_id
-    assert sharepoint_graphql.documents_id == mock_documents_id
+    assert getattr(sp_template, attribute) == expected
 
 
-def test_sharepoint_graphql__convert_site_url_to_graph_format_success(mock_object):
+def test_sharepoint_graphql__convert_site_url_to_graph_format_success(sp):
     # Arrange
     assigned_site_url = "https://mycompany.sharepoint.com/sites/warehouse"
     expected_site_url = "mycompany.sharepoint.com:/sites/warehouse:/"
 
     # Act
-    site_url = mock_object._convert_site_url_to_graph_format(assigned_site_url)
+    site_url = sp._convert_site_url_to_graph_format(assigned_site_url)
 
     # Assert
     assert site_url == expected_site_url
 
 
-def test_sharepoint_graphql__convert_site_url_to_graph_format_failure(mock_object):
+def test_sharepoint_graphql__convert_site_url_to_graph_format_failure(sp):
     # Arrange
     assigned_site_url = "http://mycompany.sharepoint.com/sites/warehouse"
 
     # Act & Assert
     with pytest.raises(ConnectionError, match="Invalid URL format. URL must start with 'https://'."):
-        mock_object._convert_site_url_to_graph_format(assigned_site_url)
+        sp._convert_site_url_to_graph_format(assigned_site_url)
 
 
-def test_sharepointgraphql__get_site_id_success(mock_object_for_testing_site_id, monkeypatch):
-    # Arrange
-    mock_site_url = "https://mycompany.sharepoint.com/sites/warehouse"
-    expected_site_id = "a_mock_site_id"
-    mock_response = {
-        "id": expected_site_id
-    }
-
-    def mock_get(url, headers):
-        print(f"Mocked GET request to URL: {url} with headers: {headers}")
-        return MockResponse(mock_response, 200)
-
-    monkeypatch.setattr("requests.get", mock_get)
-
+def test_sharepoint_graphql__build_graph_url_encodes_path(sp):
     # Act
-    site_id = mock_object_for_testing_site_id._get_site_id("mock_access_token", mock_site_url)
+    url = sp._build_graph_url("/Shared Documents/Q1 #2.xlsx", "content")
 
     # Assert
-    assert site_id == expected_site_id
+    assert url == ("https://graph.microsoft.com/v1.0/sites/mock_site_id/drive/root:/"
+                   "Shared%20Documents/Q1%20%232.xlsx:/content")
 
 
-def test_sharepointgraphql__get_document_id_success(mock_object_for_testing_document_id, monkeypatch):
+def test_sharepointgraphql__get_site_id_success(sp, mock_http):
     # Arrange
-    expected_document_id = "a_mock_documents_id"
-    mock_response = {
-        "id": expected_document_id
-    }
-
-    def mock_get(url, headers):
-        print(f"Mocked GET request to URL: {url} with headers: {headers}")
-        return MockResponse(mock_response, 200)
-
-    monkeypatch.setattr("requests.get", mock_get)
+    mock_site_url = "mycompany.sharepoint.com:/sites/warehouse:/"
+    expected_site_id = "a_mock_site_id"
+    mock_http.add(responses.GET, f"{SharePointGraphql.GRAPH_BASE_URL}/sites/{mock_site_url}",
+                  json={"id": expected_site_id})
 
     # Act
-    document_id = mock_object_for_testing_document_id._get_document_id("mock_access_token")
+    site_id = sp._get_site_id(mock_site_url)
 
     # Assert
-    assert document_id == expected_document_id
+    assert site_id == expected_site_id
 
 
-def test_sharepointgraphql__get_document_id_failure(mock_object_for_testing_document_id, monkeypatch):
+@pytest.mark.parametrize("status, response, exc", [
+    (200, {"id": "a_mock_documents_id"}, None),
+    (400, {"error": {"code": "InvalidRequest", "message": "Invalid request"}}, ConnectionError),
+], ids=["success", "failure"])
+def test_sharepointgraphql__get_document_id(sp, mock_http, status, response, exc):
     # Arrange
-    error_response = {
-        "error": {
-            "code": "InvalidRequest",
-            "message": "Invalid request"
-        }
-    }
-
-    def mock_get(url, headers):
-        return MockResponse(error_response, 400)
-
-    monkeypatch.setattr("requests.get", mock_get)
+    mock_http.add(responses.GET, _DRIVE_URL, json=response, status=status)
 
     # Act & Assert
-    with pytest.raises(ConnectionError) as exc_info:
-        mock_object_for_testing_document_id._get_document_id("mock_access_token")
+    with pytest.raises(exc, match="^Invalid request$") if exc else nullcontext():
+        document_id = sp._get_document_id()
 
-    assert str(exc_info.value) == "Invalid request"
+    if exc is None:
+        assert document_id == "a_mock_documents_id"
 
 
-def test_sharepointgraphql_list_files_success(mock_object, monkeypatch):
+@pytest.mark.parametrize("status, exc", [(200, None), (400, requests.exceptions.HTTPError)], ids=["success", "failure"])
+def test_sharepointgraphql_list_files(sp, mock_http, status, exc):
     # Arrange
     folder_path = "Documents/Folder"
     first_response = {
@@ -318,7 +185,7 @@ def test_sharepointgraphql_list_files_success(mock_object, monkeypatch):
             {"name": "file1.txt", "id": "1"},
             {"name": "file2.txt", "id": "2"}
         ],
-        "@odata.nextLink": "https://graph.microsoft.com/v1.0/nextPage"
+        "@odata.nextLink": _NEXT_PAGE_URL
     }
     second_response = {
         "value": [
@@ -326,64 +193,62 @@ def test_sharepointgraphql_list_files_success(mock_object, monkeypatch):
             {"name": "file4.txt", "id": "4"}
         ]
     }
+    mock_http.add(responses.GET, _LIST_CHILDREN_URL, json=first_response, status=status)
+    mock_http.add(responses.GET, _NEXT_PAGE_URL, json=second_response, status=status)
+
+    # Act & Assert
+    with pytest.raises(exc, match="^400 Client Error") if exc else nullcontext():
+        files = sp.list_files(folder_path)
+
+    if exc is None:
+        assert [f["name"] for f in files] == ["file1.txt", "file2.txt", "file3.txt", "file4.txt"]
 
-    def mock_get(url, headers):
-        if url == "https://graph.microsoft.com/v1.0/drives/mock_documents_id/root:/Documents/Folder:/children":
-            return MockResponse(first_response, 200)
-        elif url == "https://graph.microsoft.com/v1.0/nextPage":
-            return MockResponse(second_response, 200)
-        else:
-            raise ConnectionError("Unexpected URL")
 
-    monkeypatch.setattr("requests.get", mock_get)
+def test_sharepointgraphql_iter_files_fetches_pages_lazily(sp, mock_http):
+    # Arrange
+    first_response = {
+        "value": [{"name": "file1.txt", "id": "1"}],
+        "@odata.nextLink": _NEXT_PAGE_URL
+    }
+    mock_http.add(responses.GET, _LIST_CHILDREN_URL, json=first_response)
 
     # Act
-    files = mock_object.list_files(folder_path)
+    first_file = next(sp.iter_files("Documents/Folder"))
 
     # Assert
-    assert len(files) == 4
-    assert files[0]["name"] == "file1.txt"
-    assert files[1]["name"] == "file2.txt"
-    assert files[2]["name"] == "file3.txt"
-    assert files[3]["name"] == "file4.txt"
+    assert first_file["name"] == "file1.txt"
+    assert len(mock_http.calls) == 1
 
 
-def test_sharepointgraphql_list_files_failure(mock_object, monkeypatch):
+def test_sharepointgraphql_list_files_with_select_and_page_size(sp, mock_http):
     # Arrange
-    folder_path = "Documents/Folder"
-    error_response = {
-        "error": {
-            "code": "InvalidRequest",
-            "message": "Invalid request"
-        }
+    first_response = {
+        "value": [{"name": "file1.txt"}],
+        "@odata.nextLink": f"{_NEXT_PAGE_URL}?$select=name&$top=2"
     }
+    second_response = {"value": [{"name": "file2.txt"}]}
+    mock_http.add(responses.GET, _LIST_CHILDREN_URL, json=first_response,
+                  match=[matchers.query_param_matcher({"$select": "name", "$top": "2"})])
+    mock_http.add(responses.GET, first_response["@odata.nextLink"], json=second_response)
 
-    def mock_get(url, headers):
-        return MockResponse(error_response, 400)
-
-    monkeypatch.setattr("requests.get", mock_get)
-
-    # Act & Assert
-    with pytest.raises(ConnectionError) as exc_info:
-        mock_object.list_files(folder_path)
+    # Act
+    files = sp.list_files("Documents/Folder", select=["name"], page_size=2)
 
-    assert str(exc_info.value) == "Mocked error"
+    # Assert
+    assert [f["name"] for f in files] == ["file1.txt", "file2.txt"]
+    assert mock_http.calls[1].request.url == first_response["@odata.nextLink"]
 
 
-def test_sharepointgraphql__resolve_absolute_path(mock_object, monkeypatch):
+def test_sharepointgraphql__resolve_absolute_path(sp, monkeypatch):
     # Arrange
-    full_folder_path = pathlib.PurePath("/root/Folder")
-    partial_folder_path = pathlib.PurePath("Folder")
-    expected_path_full_path = pathlib.PurePath("/root/Folder")
-
     def mock_getcwd(*args):
         return "/root"
 
     monkeypatch.setattr("os.getcwd", mock_getcwd)
 
     # Act
-    test_path_full = mock_object._resolve_absolute_path(full_folder_path)
-    test_path_partial = mock_object._resolve_absolute_path(partial_folder_path)
+    test_path_full = sp._resolve_absolute_path(_FULL_PATH)
+    test_path_partial = sp._resolve_absolute_path(_PARTIAL_PATH)
 
     # Change the expected path to match the operating system
     if os.name == 'nt':  # For Windows
@@ -391,42 +256,31 @@ def test_sharepointgraphql__resolve_absolute_path(mock_object, monkeypatch):
         test_path_partial = pathlib.PurePath(test_path_partial)
 
     # Assert
-    assert test_path_full == expected_path_full_path
-    assert test_path_partial == str(expected_path_full_path)
+    assert test_path_full == _FULL_PATH
+    assert test_path_partial == str(_FULL_PATH)
 
 
-def test_sharepointgraphql_ensure_directory_exists(mock_object, monkeypatch, capsys):
+def test_sharepointgraphql_ensure_directory_exists(sp, monkeypatch, tmp_path):
     # Arrange
-    if os.name == 'nt':  # For Windows
-        directory_path_exists = os.path.join(os.environ.get('TEMP'), 'file.txt')
-    else:  # For Unix-like systems
-        directory_path_exists = "/tmp/file.txt"
-
-    directory_path_not_exists = "/tmp/not_exists/file.txt"
-
-    expected_output_directory_does_not_exist = "Mocked os.makedirs\n"
-
-    def mock_makedirs(file_path):
-        print("Mocked os.makedirs")
-
+    directory_path_exists = os.path.join(tmp_path, "file.txt")
+    directory_path_not_exists = os.path.join(tmp_path, "not_exists", "file.txt")
+    mock_makedirs = MagicMock()
     monkeypatch.setattr("os.makedirs", mock_makedirs)
 
     # Act
-    mock_object._ensure_directory_exists(directory_path_exists)
-    captured_path_exists = capsys.readouterr()
-
-    mock_object._ensure_directory_exists(directory_path_not_exists)
-    captured_path_does_not_exist = capsys.readouterr()
+    sp._ensure_directory_exists(directory_path_exists)
+    sp._ensure_directory_exists(directory_path_not_exists)
 
     # Assert
-    assert captured_path_exists.out == ''
-    assert captured_path_does_not_exist.out == expected_output_directory_does_not_exist
+    assert mock_makedirs.call_args_list == [
+        call(str(tmp_path), exist_ok=True),
+        call(os.path.join(tmp_path, "not_exists"), exist_ok=True),
+    ]
 
 
-def test_sharepointgraphql__setup_local_directory(mock_object, monkeypatch):
+def test_sharepointgraphql__setup_local_directory(sp, monkeypatch):
     # Arrange
-    output_path = pathlib.PurePath("test_directory/test_file.txt")
-    expected_output_path = os.path.abspath(output_path)
+    expected_output_path = os.path.abspath(_OUTPUT_PATH)
 
     def mock_ensure_directory_exists(file_path):
         pass
@@ -434,13 +288,14 @@ def test_sharepointgraphql__setup_local_directory(mock_object, monkeypatch):
     monkeypatch.setattr("sharepoint_graphql.SharePointGraphql._ensure_directory_exists", mock_ensure_directory_exists)
 
     # Act
-    result = mock_object._setup_local_directory(output_path)
+    result = sp._setup_local_directory(_OUTPUT_PATH)
 
     # Assert
     assert result == expected_output_path
 
 
-def test_sharepointgraphql_download_file_success(mock_object, monkeypatch):
+@pytest.mark.parametrize("status, exc", [(200, None), (404, TransactionError)], ids=["success", "failure"])
+def test_sharepointgraphql_download_file(sp, mock_http, monkeypatch, status, exc):
     # Arrange
     test_url = "https://example.com/test.txt"
     test_output_path = "test/output/file.txt"
@@ -449,99 +304,121 @@ def test_sharepointgraphql_download_file_success(mock_object, monkeypatch):
 
     # Mock the setup_local_directory method
     monkeypatch.setattr(
-        mock_object,
+        sp,
         "_setup_local_directory",
         MagicMock(return_value=mock_absolute_path)
     )
 
-    # Mock requests.get to return a response that can be iterated for content
-    mock_response = MagicMock()
-    mock_response.iter_content.return_value = [mock_content]
-    monkeypatch.setattr(
-        "requests.get",
-        MagicMock(return_value=mock_response)
-    )
+    mock_http.add(responses.GET, test_url, body=mock_content, status=status)
 
     # Mock open function to avoid actual file operations
-    mock_file = MagicMock(spec=TextIOWrapper)
+    mock_file = MagicMock()
     mock_open = MagicMock(return_value=mock_file)
     monkeypatch.setattr("builtins.open", mock_open)
 
+    # Act & Assert
+    with pytest.raises(exc) if exc else nullcontext():
+        sp.download_file(test_url, test_output_path)
+
+    assert "Authorization" not in mock_http.calls[0].request.headers
+    if exc is None:
+        sp._setup_local_directory.assert_called_once_with(test_output_path)
+        mock_open.assert_called_once_with(mock_absolute_path, "wb")
+        mock_file.__enter__().write.assert_called_once_with(mock_content)
+
+
+def test_sharepointgraphql_download_file_in_ranges(sp, mock_http, monkeypatch, tmp_path):
+    # Arrange
+    test_url = "https://mycompany.sharepoint.com/download/test.bin"
+    content = b"0123456789"
+    output_path = tmp_path / "test.bin"
+    ranges_requested = []
+
+    def range_callback(request):
+        if "Range" not in request.headers:
+            return 200, {"Accept-Ranges": "bytes", "Content-Length": str(len(content))}, content
+        ranges_requested.append(request.headers["Range"])
+        start, end = map(int, request.headers["Range"].removeprefix("bytes=").split("-"))
+        return 206, {}, content[start:end + 1]
+
+    mock_http.add_callback(responses.GET, test_url, callback=range_callback)
+    monkeypatch.setattr(sp, "RANGED_DOWNLOAD_THRESHOLD", 4)
+
     # Act
-    mock_object.download_file(test_url, test_output_path)
+    sp.download_file(test_url, output_path, max_parts=3)
 
     # Assert
-    mock_object._setup_local_directory.assert_called_once_with(test_output_path)
-    mock_response.raise_for_status.assert_called_once()
-    mock_open.assert_called_once_with(mock_absolute_path, "wb")
-    mock_file.__enter__().write.assert_called_once_with(mock_content)
-    mock_response.iter_content.assert_called_once_with(chunk_size=1024)
+    assert sorted(ranges_requested) == ["bytes=0-3", "bytes=4-7", "bytes=8-9"]
+    assert output_path.read_bytes() == content
 
 
-def test_sharepointgraphql_download_file_failure(mock_object, monkeypatch):
+def test_sharepointgraphql_download_file_in_ranges_removes_partial_file(sp, mock_http, monkeypatch, tmp_path):
     # Arrange
-    test_url = "https://example.com/test.txt"
-    test_output_path = "test/output/file.txt"
-    mock_absolute_path = "/absolute/path/to/test/output/file.txt"
+    test_url = "https://mycompany.sharepoint.com/download/test.bin"
+    content = b"0123456789"
+    output_path = tmp_path / "test.bin"
 
-    # Mock the setup_local_directory method
-    monkeypatch.setattr(
-        mock_object,
-        "_setup_local_directory",
-        MagicMock(return_value=mock_absolute_path)
-    )
+    def range_callback(request):
+        if "Range" not in request.headers:
+            return 200, {"Accept-Ranges": "bytes", "Content-Length": str(len(content))}, content
+        if request.headers["Range"] == "bytes=4-7":
+            return 404, {}, ""
+        start, end = map(int, request.headers["Range"].removeprefix("bytes=").split("-"))
+        return 206, {}, content[start:end + 1]
 
-    class MockResponse:
-        def __init__(self, json_data, status_code=200):
-            self.json_data = json_data
-            self.status_code = status_code
+    mock_http.add_callback(responses.GET, test_url, callback=range_callback)
+    monkeypatch.setattr(sp, "RANGED_DOWNLOAD_THRESHOLD", 4)
 
-        def json(self):
-            return self.json_data
+    # Act & Assert
+    with pytest.raises(TransactionError, match="^Error downloading file: 404 Client Error"):
+        sp.download_file(test_url, output_path, max_parts=3)
+    assert not output_path.exists()
 
-        def raise_for_status(self):
-            if self.status_code != 200:
-                raise requests.exceptions.HTTPError("HTTP Error")
 
-    def mock_requests_get(*args, **kwargs):
-        return MockResponse({"Error": "Resource not found."}, 404)
+def test_sharepointgraphql_download_filestream_returns_bytes(sp, mock_http):
+    # Arrange
+    remote_path = "Documents/report.xlsx"
+    download_url = "https://mycompany.sharepoint.com/download/report.xlsx"
+    content = b"PK\x03\x04\xff binary"
+    mock_http.add(responses.GET, sp._build_graph_url(remote_path),
+                  json={SharePointGraphql.DOWNLOAD_URL_KEY: download_url})
+    mock_http.add(responses.GET, download_url, body=content)
 
-    # Mock requests.get to raise an exception
-    monkeypatch.setattr(
-        "requests.get",
-        mock_requests_get
-    )
+    # Act
+    stream = sp.download_filestream(remote_path)
 
-    # Act & Assert
-    with pytest.raises(TransactionError):
-        mock_object.download_file(test_url, test_output_path)
+    # Assert
+    assert stream.read() == content
 
 
-def test_sharepointgraphql_download_file_by_relative_path_success(mock_object, monkeypatch):
+def test_sharepointgraphql_download_filestream_non_json_metadata(sp, mock_http):
     # Arrange
-    remote_path = "Documents/test.txt"
-    local_path = "local/test.txt"
-    mock_download_url = "https://graph.microsoft.com/downloads/test.txt"
+    remote_path = "Documents/report.xlsx"
+    mock_http.add(responses.GET, sp._build_graph_url(remote_path), body="<html>Bad Gateway</html>")
 
-    class MockResponse:
-        def __init__(self, json_data, status_code=200):
-            self.json_data = json_data
-            self.status_code = status_code
+    # Act & Assert
+    with pytest.raises(TransactionError, match="^Error retrieving file metadata"):
+        sp.download_filestream(remote_path)
 
-        def json(self):
-            return self.json_data
 
-        def raise_for_status(self):
-            if self.status_code != 200:
-                raise requests.exceptions.RequestException("HTTP Error")
+def test_sharepointgraphql_download_textstream(sp, monkeypatch):
+    # Arrange
+    monkeypatch.setattr(sp, "download_filestream", MagicMock(return_value=BytesIO("héllo".encode("latin-1"))))
 
-    def mock_requests_get(*args, **kwargs):
-        if args[0] == f"{SharePointGraphql.GRAPH_BASE_URL}/sites/{mock_object.site_id}/drive/root:/{remote_path}":
-            return MockResponse({SharePointGraphql.DOWNLOAD_URL_KEY: mock_download_url})
-        return MockResponse({})
+    # Act
+    stream = sp.download_textstream("Documents/notes.txt", encoding="latin-1")
 
-    # Mock the requests.get method and download_file
-    monkeypatch.setattr("requests.get", mock_requests_get)
+    # Assert
+    assert stream.read() == "héllo"
+
+
+def test_sharepointgraphql_download_file_by_relative_path_success(sp, mock_http, monkeypatch):
+    # Arrange
+    remote_path = "Documents/test.txt"
+    local_path = "local/test.txt"
+    mock_download_url = "https://graph.microsoft.com/downloads/test.txt"
+    mock_http.add(responses.GET, f"{SharePointGraphql.GRAPH_BASE_URL}/sites/{sp.site_id}/drive/root:/{remote_path}",
+                  json={SharePointGraphql.DOWNLOAD_URL_KEY: mock_download_url})
     download_file_called = False
 
     # Mock the download_file method
@@ -551,245 +428,558 @@ def test_sharepointgraphql_download_file_by_relative_path_success(mock_object, m
         assert output_path == local_path
         download_file_called = True
 
-    monkeypatch.setattr(mock_object, "download_file", mock_download_file)
+    monkeypatch.setattr(sp, "download_file", mock_download_file)
 
     # Act
-    mock_object.download_file_by_relative_path(remote_path, local_path)
+    sp.download_file_by_relative_path(remote_path, local_path, prefetch_url=True)
 
     # Assert
     assert download_file_called
 
 
-def test_sharepointgraphql_download_file_by_relative_path_missing_download_url(mock_object, monkeypatch):
+def test_sharepointgraphql_download_file_by_relative_path_follows_content_redirect(sp, mock_http, tmp_path):
     # Arrange
     remote_path = "Documents/test.txt"
-    local_path = "local/test.txt"
+    local_path = tmp_path / "test.txt"
+    download_url = "https://mycompany.sharepoint.com/download/test.txt"
+    mock_http.add(responses.GET, sp._build_graph_url(remote_path, "content"),
+                  status=302, headers={"Location": download_url})
+    mock_http.add(responses.GET, download_url, body=b"test content")
 
-    class MockResponse:
-        def json(self):
-            return {}
+    # Act
+    sp.download_file_by_relative_path(remote_path, local_path)
+
+    # Assert
+    assert [call.request.url for call in mock_http.calls] == [sp._build_graph_url(remote_path, "content"),
+                                                              download_url]
+    assert "Authorization" not in mock_http.calls[1].request.headers
+    assert local_path.read_bytes() == b"test content"
 
-        def raise_for_status(self):
-            pass
 
-    monkeypatch.setattr("requests.get", lambda *args, **kwargs: MockResponse())
+def test_sharepointgraphql_download_file_by_relative_path_missing_download_url(sp, mock_http):
+    # Arrange
+    remote_path = "Documents/test.txt"
+    local_path = "local/test.txt"
+    mock_http.add(responses.GET, sp._build_graph_url(remote_path), json={})
 
     # Act & Assert
     with pytest.raises(KeyError, match="Download URL not found in response"):
-        mock_object.download_file_by_relative_path(remote_path, local_path)
+        sp.download_file_by_relative_path(remote_path, local_path, prefetch_url=True)
 
 
-def test_sharepointgraphql_download_file_by_relative_path_http_error(mock_object, monkeypatch):
+def test_sharepointgraphql_download_file_by_relative_path_http_error(sp, mock_http):
     # Arrange
     remote_path = "Documents/test.txt"
     local_path = "local/test.txt"
+    mock_http.add(responses.GET, sp._build_graph_url(remote_path, "content"), status=404)
+
+    # Act & Assert
+    with pytest.raises(requests.exceptions.HTTPError, match="^404 Client Error"):
+        sp.download_file_by_relative_path(remote_path, local_path)
 
-    class MockResponse:
-        def raise_for_status(self):
-            raise requests.exceptions.RequestException("HTTP Error")
 
-    monkeypatch.setattr("requests.get", lambda *args, **kwargs: MockResponse())
+def test_download_many(sp, monkeypatch):
+    # Arrange
+    pairs = [("Documents/a.txt", "local/a.txt"), ("Documents/b.txt", "local/b.txt")]
+    mock_download = MagicMock()
+    monkeypatch.setattr(sp, "download_file_by_relative_path", mock_download)
+
+    # Act
+    sp.download_many(pairs, max_workers=2)
+
+    # Assert
+    assert sorted(call.args for call in mock_download.call_args_list) == [pair + (False,) for pair in pairs]
+
+
+def test_download_many_grows_connection_pool(sp, monkeypatch):
+    # Arrange
+    # The copy shares the template's session, so mount the larger pool on a fresh one.
+    monkeypatch.setattr(sp, "session", sp._create_session())
+    monkeypatch.setattr(sp, "download_file_by_relative_path", MagicMock())
+    previous = sp.session.get_adapter(SharePointGraphql.GRAPH_BASE_URL)
+    monkeypatch.setattr(previous, "close", MagicMock())
+
+    # Act
+    sp.download_many([], max_workers=10, prefetch_url=True)
+
+    # Assert
+    adapter = sp.session.get_adapter(SharePointGraphql.GRAPH_BASE_URL)
+    assert adapter._pool_maxsize == 10 * SharePointGraphql.DOWNLOAD_PARTS
+    previous.close.assert_called_once()
+
+
+def test_run_concurrently_cancels_queued_tasks_on_failure():
+    # Arrange
+    calls = []
+
+    def task(index):
+        calls.append(index)
+        if index == 0:
+            raise TransactionError("task 0 failed")
+        time.sleep(0.01)
 
     # Act & Assert
-    with pytest.raises(requests.exceptions.RequestException, match="HTTP Error"):
-        mock_object.download_file_by_relative_path(remote_path, local_path)
+    with pytest.raises(TransactionError, match="^task 0 failed"):
+        SharePointGraphql._run_concurrently(task, [(index,) for index in range(100)], max_workers=1)
+    assert len(calls) < 100
 
 
-def test_delete_file_by_relative_path(mock_object, monkeypatch):
+def test_upload_many_keeps_supplied_adapter(mock_client, mock_lookups, monkeypatch):
     # Arrange
-    remote_path = "Documents/test.txt"
-    mock_response = {
-        "id": "mock_file_id"
-    }
+    adapter = requests.adapters.HTTPAdapter(pool_maxsize=2)
+    sp = SharePointGraphql(**mock_client, adapter=adapter)
+    monkeypatch.setattr(sp, "upload_file_by_relative_path", MagicMock())
+
+    # Act
+    sp.upload_many([], max_workers=10)
+
+    # Assert
+    assert sp.session.get_adapter(SharePointGraphql.GRAPH_BASE_URL) is adapter
+
+
+def test_download_many_failure(sp, monkeypatch):
+    # Arrange
+    pairs = [("Documents/a.txt", "local/a.txt")]
+    monkeypatch.setattr(sp, "download_file_by_relative_path",
+                        MagicMock(side_effect=TransactionError("Mocked error")))
 
-    def mock_delete(url, headers):
-        return MockResponse(mock_response, 200)
+    # Act & Assert
+    with pytest.raises(TransactionError, match="Mocked error"):
+        sp.download_many(pairs)
 
-    monkeypatch.setattr("requests.delete", mock_delete)
+
+def test_upload_many(sp, monkeypatch):
+    # Arrange
+    pairs = [("Documents/a.txt", "local/a.txt"), ("Documents/b.txt", "local/b.txt")]
+    mock_upload = MagicMock()
+    monkeypatch.setattr(sp, "upload_file_by_relative_path", mock_upload)
 
     # Act
-    result = mock_object.delete_file_by_relative_path(remote_path)
+    sp.upload_many(pairs, max_workers=2)
 
     # Assert
-    assert result is None
+    assert sorted(call.args for call in mock_upload.call_args_list) == pairs
 
 
-def test_delete_file_by_relative_path_failure(mock_object, monkeypatch):
+@pytest.mark.parametrize("status, exc", [(204, None), (404, TransactionError)], ids=["success", "failure"])
+def test_delete_file_by_relative_path(sp, mock_http, status, exc):
     # Arrange
     remote_path = "Documents/test.txt"
-    mock_response = {
-        "id": "mock_file_id"
-    }
+    mock_http.add(responses.DELETE, sp._build_graph_url(remote_path), status=status)
 
-    def mock_delete(url, headers):
-        return MockResponseTransactionError(mock_response, 404)
+    # Act & Assert
+    with pytest.raises(exc) if exc else nullcontext():
+        result = sp.delete_file_by_relative_path(remote_path)
 
-    monkeypatch.setattr("requests.delete", mock_delete)
+    if exc is None:
+        assert result is None
 
-    # Act & Assert
-    with pytest.raises(TransactionError):
-        mock_object.delete_file_by_relative_path(remote_path)
 
+def test_batch_splits_requests_into_chunks(sp, mock_http):
+    # Arrange
+    sub_requests = [{"method": "DELETE", "url": f"/items/{index}"} for index in range(21)]
+
+    def batch_callback(request):
+        entries = json.loads(request.body)["requests"]
+        return 200, {}, json.dumps({"responses": [{"id": r["id"], "status": 204} for r in reversed(entries)]})
 
-def test__execute_move_request(mock_object, monkeypatch):
+    mock_http.add_callback(responses.POST, _BATCH_URL, callback=batch_callback)
+
+    # Act
+    batch_responses = sp.batch(sub_requests)
+
+    # Assert
+    posted_chunks = [json.loads(call.request.body)["requests"] for call in mock_http.calls]
+    assert [len(chunk) for chunk in posted_chunks] == [20, 1]
+    assert [response["id"] for response in batch_responses] == [str(index) for index in range(21)]
+
+
+@pytest.mark.parametrize("retry_after, expected_delay", [
+    ("2", 2),
+    ("1.5", 1.5),
+    ("Wed, 21 Oct 2015 07:28:00 GMT", 0),
+    ("soon", 1),
+], ids=["seconds", "fractional", "http_date", "unparseable"])
+def test_batch_retries_throttled_requests(sp, mock_http, monkeypatch, retry_after, expected_delay):
     # Arrange
-    source_path = "Documents/test.txt"
-    destination_path = "Documents/Folder/test.txt"
-    mock_response = {
-        "id": "mock_file_id"
-    }
+    sub_requests = [{"method": "PATCH", "url": "/items/0", "body": {"name": "new.txt"}}]
+    for status in (429, 200):
+        mock_http.add(responses.POST, _BATCH_URL,
+                      json={"responses": [{"id": "0", "status": status, "headers": {"Retry-After": retry_after}}]})
+    mock_sleep = MagicMock()
+    monkeypatch.setattr("time.sleep", mock_sleep)
+
+    # Act
+    batch_responses = sp.batch(sub_requests)
 
-    def mock_patch(url, headers, stream, json):
-        return MockResponse(mock_response, 200)
+    # Assert
+    posted_chunks = [json.loads(call.request.body)["requests"] for call in mock_http.calls]
+    assert batch_responses[0]["status"] == 200
+    assert posted_chunks[0][0]["headers"] == {"Content-Type": "application/json"}
+    assert len(posted_chunks) == 2
+    mock_sleep.assert_called_once_with(expected_delay)
+
+
+@pytest.mark.parametrize("response", [
+    {"status": 503},
+    {"body": requests.exceptions.ConnectionError("Connection reset")},
+], ids=["server_error", "connection_error"])
+def test_batch_failure_is_not_resent(sp, mock_http, response):
+    # Arrange
+    mock_http.add(responses.POST, _BATCH_URL, **response)
 
-    monkeypatch.setattr("requests.patch", mock_patch)
+    # Act & Assert
+    with pytest.raises(TransactionError, match="^Error executing batch request"):
+        sp.batch([{"method": "DELETE", "url": "/items/0"}])
+    assert len(mock_http.calls) == 1
+
+
+def test_delete_many(sp, monkeypatch):
+    # Arrange
+    remote_paths = ["Documents/a.txt", "Documents/b.txt"]
+    mock_batch = MagicMock(return_value=[{"id": "0", "status": 204}, {"id": "1", "status": 204}])
+    monkeypatch.setattr(sp, "batch", mock_batch)
 
     # Act
-    result = mock_object._execute_move_request(source_path, destination_path)
+    sp.delete_many(remote_paths)
 
     # Assert
-    assert result is None
+    mock_batch.assert_called_once_with([
+        {"method": "DELETE", "url": "/sites/mock_site_id/drive/root:/Documents/a.txt"},
+        {"method": "DELETE", "url": "/sites/mock_site_id/drive/root:/Documents/b.txt"},
+    ])
 
 
-def test__execute_move_request_failure(mock_object, monkeypatch):
+def test_delete_many_failure(sp, monkeypatch):
     # Arrange
-    source_path = "Documents/test.txt"
-    destination_path = "Documents/Folder/test.txt"
-    mock_response = {
-        "id": "mock_file_id"
-    }
+    remote_paths = ["Documents/a.txt", "Documents/b.txt"]
+    monkeypatch.setattr(sp, "batch",
+                        MagicMock(return_value=[{"id": "0", "status": 204}, {"id": "1", "status": 404}]))
+
+    # Act & Assert
+    with pytest.raises(TransactionError, match="Error deleting files: Documents/b.txt \\(404\\)"):
+        sp.delete_many(remote_paths)
+
+
+def test_move_many(sp, monkeypatch):
+    # Arrange
+    pairs = [("Documents/test.txt", "Documents/Folder/test.txt")]
+    mock_batch = MagicMock(return_value=[{"id": "0", "status": 200}])
+    monkeypatch.setattr(sp, "batch", mock_batch)
+
+    # Act
+    sp.move_many(pairs)
+
+    # Assert
+    mock_batch.assert_called_once_with([{
+        "method": "PATCH",
+        "url": "/sites/mock_site_id/drive/root:/Documents/test.txt",
+        "body": sp._build_move_destination_payload("Documents/Folder/test.txt"),
+    }])
 
-    def mock_patch(url, headers, stream, json):
-        return MockResponseTransactionError(mock_response, 400)
 
-    monkeypatch.setattr("requests.patch", mock_patch)
+@pytest.mark.parametrize("status, exc", [(200, None), (400, requests.exceptions.HTTPError)], ids=["success", "failure"])
+def test__execute_move_request(sp, mock_http, status, exc):
+    # Arrange
+    source_path = "Documents/test.txt"
+    payload = sp._build_move_destination_payload("Documents/Folder/test.txt")
+    mock_http.add(responses.PATCH, sp._build_graph_url(source_path), json={"id": "mock_file_id"},
+                  status=status)
 
     # Act & Assert
-    with pytest.raises(requests.exceptions.HTTPError):
-        mock_object._execute_move_request(source_path, destination_path)
+    with pytest.raises(exc) if exc else nullcontext():
+        result = sp._execute_move_request(payload, source_path)
 
+    if exc is None:
+        assert result is None
 
-def test__build_move_destination_payload(mock_object):
+
+def test__build_move_destination_payload(sp):
     # Arrange
     file_name = "test.txt"
     destination_path = f"Documents/{file_name}"
     expected_destination_path = destination_path.split("/")[0]
     expected_payload = {
         "parentReference": {
-            "path": f"drives/{mock_object.documents_id}/root:/{expected_destination_path}"},
+            "path": f"drives/{sp.documents_id}/root:/{expected_destination_path}"},
         "name": file_name
     }
 
     # Act
-    payload = mock_object._build_move_destination_payload(destination_path)
+    payload = sp._build_move_destination_payload(destination_path)
 
     # Assert
     assert payload == expected_payload
 
 
-def test_move_file_success(mock_object, monkeypatch):
+@pytest.mark.parametrize("status, exc", [(200, None), (400, TransactionError)], ids=["success", "failure"])
+def test_move_file(sp, mock_http, status, exc):
     # Arrange
     source_path = "Documents/test.txt"
     destination_path = "Documents/Folder/test.txt"
     expected_payload = {
         "parentReference": {
-            "path": f"drives/{mock_object.documents_id}/root:/Documents/Folder"
+            "path": f"drives/{sp.documents_id}/root:/Documents/Folder"
         },
         "name": "test.txt"
     }
+    mock_http.add(responses.PATCH, sp._build_graph_url(source_path), json={"id": "mock_file_id"},
+                  status=status, match=[matchers.json_params_matcher(expected_payload)])
+
+    # Act & Assert
+    with pytest.raises(exc, match="^Error moving file: 400 Client Error") if exc else nullcontext():
+        result = sp.move_file(source_path, destination_path)
+
+    if exc is None:
+        assert result is None
+
+
+@pytest.mark.parametrize("status, exc", [(200, None), (400, requests.exceptions.HTTPError)], ids=["success", "failure"])
+def test_upload_file_by_relative_path(sp, mock_http, tmp_path, status, exc):
+    # Arrange
+    remote_path = "Documents/test.txt"
+    local_path = tmp_path / "test.txt"
+    local_path.write_bytes(b"test content")
+    uploaded = []
+
+    def upload_callback(request):
+        uploaded.append(request.body)
+        return status, {}, "{}"
 
-    def mock_patch(url, headers, json, stream):
-        assert url == mock_object._build_graph_url(source_path)
-        assert headers == mock_object.headers
-        assert json == expected_payload
-        return MockResponse({"id": "mock_file_id"}, 200)
+    mock_http.add_callback(responses.PUT, sp._build_graph_url(remote_path, "content"),
+                           callback=upload_callback)
+
+    # Act & Assert
+    with pytest.raises(exc, match="^400 Client Error") if exc else nullcontext():
+        sp.upload_file_by_relative_path(remote_path, local_path)
 
-    monkeypatch.setattr("requests.patch", mock_patch)
+    assert uploaded == [b"test content"]
+
+
+def test_upload_file_by_relative_path_empty_file(sp, mock_http, tmp_path):
+    # Arrange
+    remote_path = "Documents/empty.txt"
+    local_path = tmp_path / "empty.txt"
+    local_path.write_bytes(b"")
+    mock_http.add(responses.PUT, sp._build_graph_url(remote_path, "content"), json={})
 
     # Act
-    result = mock_object.move_file(source_path, destination_path)
+    sp.upload_file_by_relative_path(remote_path, local_path)
 
     # Assert
-    assert result is None
+    headers = mock_http.calls[0].request.headers
+    assert headers["Content-Length"] == "0"
+    assert "Transfer-Encoding" not in headers
 
 
-def test_move_file_failure(mock_object, monkeypatch):
+def test_upload_file_by_relative_path_in_chunks(sp, mock_http, monkeypatch, tmp_path):
     # Arrange
-    source_path = "Documents/test.txt"
-    destination_path = "Documents/Folder/test.txt"
-    error_message = "Failed to move file"
+    remote_path = "Documents/large.bin"
+    local_path = tmp_path / "large.bin"
+    local_path.write_bytes(b"0123456789")
+    upload_url = "https://mycompany.sharepoint.com/upload-session"
+    mock_http.add(responses.POST, sp._build_graph_url(remote_path, "createUploadSession"),
+                  json={"uploadUrl": upload_url})
+    mock_http.add(responses.PUT, upload_url, json={})
+    monkeypatch.setattr(sp, "SIMPLE_UPLOAD_LIMIT", 4)
+    monkeypatch.setattr(sp, "UPLOAD_CHUNK_SIZE", 4)
 
-    def mock_patch(*args, **kwargs):
-        raise requests.exceptions.HTTPError(error_message)
+    # Act
+    sp.upload_file_by_relative_path(remote_path, local_path)
 
-    monkeypatch.setattr("requests.patch", mock_patch)
+    # Assert
+    chunk_requests = [call.request for call in mock_http.calls[1:]]
+    assert [(request.body, request.headers["Content-Range"]) for request in chunk_requests] == [
+        (b"0123", "bytes 0-3/10"),
+        (b"4567", "bytes 4-7/10"),
+        (b"89", "bytes 8-9/10"),
+    ]
+    assert all("Authorization" not in request.headers for request in chunk_requests)
 
-    # Act & Assert
-    with pytest.raises(TransactionError, match=f"Error moving file: {error_message}"):
-        mock_object.move_file(source_path, destination_path)
+
+@pytest.mark.parametrize("sp", ["skip_token"], indirect=True)
+def test_request_refreshes_expiring_token(sp, mock_http, monkeypatch):
+    # Arrange
+    sp._token_expires_at = 0
+    monkeypatch.setattr(sp._msal_app, "acquire_token_for_client",
+                        MagicMock(return_value={"access_token": "refreshed_token", "expires_in": 3600}))
+    mock_http.add(responses.GET, _ME_URL, json={})
+
+    # Act
+    sp._request("GET", _ME_URL)
+
+    # Assert
+    assert sp.access_token == "refreshed_token"
+    assert mock_http.calls[0].request.headers["Authorization"] == "Bearer refreshed_token"
 
 
-def test_upload_file_by_relative_path_success(mock_object, monkeypatch):
+@pytest.mark.parametrize("sp", ["skip_token"], indirect=True)
+def test_request_retries_once_on_unauthorized(sp, mock_http):
     # Arrange
-    remote_path = "Documents/test.txt"
-    local_path = "local/test.txt"
-    mock_response = MagicMock()
-    mock_response.raise_for_status = MagicMock()
+    token_cache = msal.TokenCache()
+    token_cache.add({
+        "client_id": "test_client",
+        "scope": SharePointGraphql.GRAPH_SCOPES,
+        "token_endpoint": "https://login.microsoftonline.com/test_tenant/oauth2/v2.0/token",
+        "response": {"access_token": "revoked_token", "expires_in": 3600, "token_type": "Bearer"},
+    })
+    sp._msal_app.token_cache = token_cache
+    mock_http.add(responses.GET, _ME_URL, status=401)
+    mock_http.add(responses.GET, _ME_URL, json={})
 
-    def mock_put(url, headers, stream, data):
-        assert url == mock_object._build_graph_url(remote_path, "content")
-        assert headers == mock_object.headers
-        assert stream is True
-        assert data == b"mock file content"
-        return mock_response
+    # Act
+    response = sp._request("GET", _ME_URL)
 
-    monkeypatch.setattr("requests.put", mock_put)
+    # Assert
+    assert response.status_code == 200
+    assert len(mock_http.calls) == 2
+    assert list(token_cache.search(msal.TokenCache.CredentialType.ACCESS_TOKEN)) == []
 
-    mock_open = MagicMock()
-    mock_open.return_value.__enter__.return_value.read.return_value = b"mock file content"
-    monkeypatch.setattr("builtins.open", mock_open)
+
+def test_retry_request_honours_retry_after(sp, mock_http, monkeypatch):
+    # Arrange
+    mock_http.add(responses.GET, _ME_URL, status=429, headers={"Retry-After": "7"})
+    mock_http.add(responses.GET, _ME_URL, json={})
+    mock_sleep = MagicMock()
+    monkeypatch.setattr("time.sleep", mock_sleep)
 
     # Act
-    mock_object.upload_file_by_relative_path(remote_path, local_path)
+    response = sp._retry_request("GET", _ME_URL)
 
     # Assert
-    mock_response.raise_for_status.assert_called_once()
+    assert response.status_code == 200
+    mock_sleep.assert_called_once_with(7.0)
 
 
-def test_upload_file_by_relative_path_failure(mock_object, monkeypatch):
+@pytest.mark.parametrize("retry_after", [
+    "Wed, 21 Oct 2015 07:28:00 GMT",
+    "Wed, 21 Oct 2015 07:28:00 -0000",
+], ids=["gmt", "naive_zone"])
+def test_retry_delay_parses_http_dates(sp, retry_after):
     # Arrange
-    remote_path = "Documents/test.txt"
-    local_path = "local/test.txt"
+    response = requests.Response()
+    response.status_code = 503
+    response.headers["Retry-After"] = retry_after
 
-    def mock_put(url, headers, stream, data):
-        raise requests.exceptions.HTTPError("Mocked upload error")
+    # Act
+    delay = sp._retry_delay(response, 0)
 
-    monkeypatch.setattr("requests.put", mock_put)
+    # Assert
+    assert delay == 0.0
 
-    mock_open = MagicMock()
-    mock_open.return_value.__enter__.return_value.read.return_value = b"mock file content"
-    monkeypatch.setattr("builtins.open", mock_open)
+
+@pytest.mark.parametrize("kwargs, expected_timeout", [
+    ({}, SharePointGraphql.REQUEST_TIMEOUT),
+    ({"timeout": 5}, 5),
+], ids=["default", "override"])
+def test_request_sets_timeout(sp, mock_http, kwargs, expected_timeout):
+    # Arrange
+    mock_http.add(responses.GET, _ME_URL, json={})
+
+    # Act
+    sp._request("GET", _ME_URL, **kwargs)
+
+    # Assert
+    assert mock_http.calls[0].request.req_kwargs["timeout"] == expected_timeout
+
+
+def test_retry_request_closes_discarded_responses(sp, monkeypatch):
+    # Arrange
+    throttled = MagicMock(status_code=503, headers={})
+    monkeypatch.setattr(sp, "_request", MagicMock(side_effect=[throttled, MagicMock(status_code=200)]))
+    monkeypatch.setattr("time.sleep", MagicMock())
+
+    # Act
+    response = sp._retry_request("GET", _ME_URL, stream=True)
+
+    # Assert
+    assert response.status_code == 200
+    throttled.close.assert_called_once()
+
+
+def test_retry_request_retries_connection_errors_and_rewinds_body(sp, mock_http, monkeypatch, tmp_path):
+    # Arrange
+    local_path = tmp_path / "test.txt"
+    local_path.write_bytes(b"content")
+    bodies = []
+
+    def upload_callback(request):
+        bodies.append(request.body)
+        if len(bodies) == 1:
+            raise requests.exceptions.ConnectionError("Connection reset")
+        return 200, {}, "{}"
+
+    mock_http.add_callback(responses.PUT, "https://graph.microsoft.com/v1.0/upload", callback=upload_callback)
+    monkeypatch.setattr("time.sleep", MagicMock())
+
+    # Act
+    with open(local_path, "rb") as f:
+        sp._retry_request("PUT", "https://graph.microsoft.com/v1.0/upload", data=f)
+
+    # Assert
+    assert bodies == [b"content", b"content"]
+
+
+def test_retry_request_raises_after_max_retries(sp, mock_http, monkeypatch):
+    # Arrange
+    mock_http.add(responses.GET, _ME_URL, status=503)
+    monkeypatch.setattr("time.sleep", MagicMock())
 
     # Act & Assert
-    with pytest.raises(requests.exceptions.HTTPError, match="Mocked upload error"):
-        mock_object.upload_file_by_relative_path(remote_path, local_path)
+    with pytest.raises(requests.exceptions.HTTPError):
+        sp._retry_request("GET", _ME_URL)
+    assert len(mock_http.calls) == SharePointGraphql.MAX_RETRIES + 1
 
 
-def test_get_token(mock_client, mock_object_for_testing_token, monkeypatch):
+def test_session_carries_authorization_header(sp):
+    # Assert
+    assert sp.session.headers["Authorization"] == f"Bearer {MOCKS['token']}"
+    assert sp.headers is sp.session.headers
+
+
+def test_sharepoint_graphql_uses_supplied_adapter(mock_client, mock_lookups):
     # Arrange
-    mock_access_token = "mock_access_token"
+    adapter = requests.adapters.HTTPAdapter()
 
-    # class MockConfidentialClientApplication:
-    #     def __init__(self, authority, client_id, client_credential):
-    #         pass
-    #
-    #     def acquire_token_for_client(self, scopes):
-    #         return {"access_token": mock_access_token}
-    #
-    # monkeypatch.setattr("msal.ConfidentialClientApplication", MockConfidentialClientApplication)
+    # Act
+    first = SharePointGraphql(**mock_client, adapter=adapter)
+    second = SharePointGraphql(**mock_client, adapter=adapter)
+
+    # Assert
+    assert first.session.get_adapter(SharePointGraphql.GRAPH_BASE_URL) is adapter
+    assert second.session.get_adapter(SharePointGraphql.GRAPH_BASE_URL) is adapter
+    assert first.session is not second.session
+
+
+def test_context_manager_closes_session(sp, monkeypatch):
+    # Arrange
+    mock_close = MagicMock()
+    monkeypatch.setattr(sp.session.get_adapter(SharePointGraphql.GRAPH_BASE_URL), "close", mock_close)
 
     # Act
-    token = mock_object_for_testing_token._get_token(mock_client['client_id'], mock_client['client_secret'],
-                                                     mock_client['tenant_id'])
+    with sp as entered:
+        assert entered is sp
+
+    # Assert
+    mock_close.assert_called_once()
+
+
+def test_close_keeps_supplied_adapter_open(mock_client, mock_lookups):
+    # Arrange
+    adapter = MagicMock(spec=requests.adapters.HTTPAdapter)
+    sp = SharePointGraphql(**mock_client, adapter=adapter)
+
+    # Act
+    sp.close()
+
+    # Assert
+    adapter.close.assert_not_called()
+
+
+@pytest.mark.parametrize("sp", ["skip_token"], indirect=True)
+def test_get_token(mock_client, sp):
+    # Act
+    token = sp._get_token(mock_client['client_id'], mock_client['client_secret'], mock_client['tenant_id'])
+
     # Assert
-    assert token == mock_access_token
+    assert token == MOCKS["token"]